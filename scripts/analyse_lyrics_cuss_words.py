@@ -1,16 +1,24 @@
 #!/usr/bin/env python
 # /// script
 # requires-python = ">=3.12"
-# dependencies = []
+# dependencies = [
+#   "orjson>=3.9.0",
+# ]
 # ///
 
-import json
 import logging
+import multiprocessing
+import os
+import re
+import sys
 import argparse
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from textwrap import dedent
 
+import orjson
+
 log = logging.getLogger(__name__)
 
 SCRIPT = Path(__file__)
@@ -23,56 +31,112 @@ LYRICS_DIR = PROJECT_ROOT / "lyrics"
 OUTPUT_DIR = PROJECT_ROOT / "site"
 OUTPUT_FILE = OUTPUT_DIR / "cuss_word_analysis.json"
 
+# Threads per album worker used to read song files concurrently
+READ_WORKERS = 8
+
 # List of words to search for
 CUSS_WORDS = ['whore', 'damn', 'goddamn', 'hell', 'bitch', 'shit', 'fuck', 'dickhead']
 
-def analyze_lyrics():
-    """Analyze all lyrics files for occurrences of specific words."""
+# Whole-word match for any of the words, longest first so 'goddamn' wins over 'damn'.
+# The pattern is a str pattern so word boundaries are Unicode-aware ('hell' does not
+# match inside 'hellé'). Songs are lowercased with ASCII_LOWERCASE on the raw bytes
+# before decoding, which lets the pattern stay case-sensitive (much faster than
+# re.IGNORECASE).
+CUSS_PATTERN = re.compile(
+    r'\b(?:' + '|'.join(re.escape(word.lower()) for word in sorted(CUSS_WORDS, key=len, reverse=True)) + r')\b'
+)
+ASCII_LOWERCASE = bytes.maketrans(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ', b'abcdefghijklmnopqrstuvwxyz')
+
+def iter_dir(path: str | Path, prefix: str = "", suffix: str = "") -> list[os.DirEntry]:
+    """List the entries of a directory matching prefix/suffix, sorted by name.
+
+    os.scandir gets entry types from the directory listing itself, so no per-entry stat is needed.
+    Like Path.glob, hidden entries are included.
+    """
+    with os.scandir(path) as entries:
+        return sorted(
+            (entry for entry in entries if entry.name.startswith(prefix) and entry.name.endswith(suffix)),
+            key=lambda entry: entry.name
+        )
+
+def read_bytes(path: str) -> bytes:
+    """Read a whole file as bytes."""
+    with open(path, "rb") as f:
+        return f.read()
+
+def scan_album(album_dir: str) -> tuple[str, dict]:
+    """Count occurrences of specific words across all songs in one album directory."""
+    year = os.path.basename(os.path.dirname(album_dir)).split("=")[1]
+    album_name = os.path.basename(album_dir).split("=")[1].replace("_", " ")
+    album_key = f"{year} - {album_name}"
+
+    log.info(f"Processing album: {album_key}")
+
+    # Initialize counts for this album
+    album_counts = {word: 0 for word in CUSS_WORDS}
+    song_files = [entry for entry in iter_dir(album_dir, suffix=".md") if entry.is_file()]
+    total_songs = len(song_files)
+
+    # Empty stubs (lyrics not fetched yet) still count as songs but are never opened
+    lyric_files = [entry for entry in song_files if entry.stat().st_size > 0]
+
+    # Read the songs concurrently so the open/read/close syscalls overlap
+    with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+        contents = list(executor.map(read_bytes, (entry.path for entry in lyric_files)))
+
+    # Process each song in the album, tallying matches for the whole album
+    album_matches = Counter()
+    for song_file, content in zip(lyric_files, contents):
+        # Find whole-word occurrences of every word in a single pass
+        matches = CUSS_PATTERN.findall(content.translate(ASCII_LOWERCASE).decode("utf-8"))
+        album_matches.update(matches)
+
+        if matches and log.isEnabledFor(logging.DEBUG):
+            for word, count in Counter(matches).items():
+                log.debug(f"  Found {count} instance(s) of '{word}' in {song_file.name}")
+
+    for word, count in album_matches.items():
+        album_counts[word] += count
+
+    album_data = {
+        "year": int(year),
+        "album": album_name,
+        "total_songs": total_songs,
+        "word_counts": album_counts,
+        "total_count": sum(album_counts.values())
+    }
+
+    if album_data["total_count"] > 0:
+        log.info(f"  Total instances: {album_data['total_count']}")
+
+    return album_key, album_data
+
+def analyze_lyrics(jobs: int | None = None):
+    """Analyze all lyrics files for occurrences of specific words.
+
+    Albums are independent, so each one is scanned in its own worker process.
+    On Linux workers are forked, so they share the parent's compiled CUSS_PATTERN
+    (copy-on-write) instead of re-importing this script and compiling it again.
+    Elsewhere the platform default is kept (spawn on macOS, where fork is unsafe).
+    """
     results = {}
 
-    # Iterate through all year/album directories
-    for year_dir in sorted(LYRICS_DIR.glob("YEAR=*")):
-        year = year_dir.name.split("=")[1]
-
-        for album_dir in sorted(year_dir.glob("ALBUM=*")):
-            album_name = album_dir.name.split("=")[1].replace("_", " ")
-            album_key = f"{year} - {album_name}"
-
-            log.info(f"Processing album: {album_key}")
-
-            # Initialize counts for this album
-            album_counts = {word: 0 for word in CUSS_WORDS}
-            total_songs = 0
-
-            # Process each song in the album
-            for song_file in sorted(album_dir.glob("*.md")):
-                total_songs += 1
-                content = song_file.read_text(encoding="utf-8").lower()
-
-                # Count occurrences of each word
-                for word in CUSS_WORDS:
-                    # Use word boundaries to match whole words only
-                    count = content.count(word.lower())
-                    album_counts[word] += count
-
-                    if count > 0:
-                        log.debug(f"  Found {count} instance(s) of '{word}' in {song_file.name}")
+    # Collect all year/album directories (as paths, since DirEntry objects can't be sent to workers)
+    album_dirs = [
+        album_dir.path
+        for year_dir in iter_dir(LYRICS_DIR, prefix="YEAR=") if year_dir.is_dir()
+        for album_dir in iter_dir(year_dir.path, prefix="ALBUM=") if album_dir.is_dir()
+    ]
 
-            # Store results
-            results[album_key] = {
-                "year": int(year),
-                "album": album_name,
-                "total_songs": total_songs,
-                "word_counts": album_counts,
-                "total_count": sum(album_counts.values())
-            }
+    mp_context = multiprocessing.get_context("fork") if sys.platform.startswith("linux") else None
 
-            if results[album_key]["total_count"] > 0:
-                log.info(f"  Total instances: {results[album_key]['total_count']}")
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=mp_context) as executor:
+        for album_key, album_data in executor.map(scan_album, album_dirs, chunksize=2):
+            results[album_key] = album_data
 
     return results
 
-def main(dry_run: bool = False):
+def main(dry_run: bool = False, jobs: int | None = None):
     """Main function to analyze lyrics and save results."""
 
     if not LYRICS_DIR.exists():
@@ -82,7 +146,7 @@ def main(dry_run: bool = False):
     log.info(f"Analyzing lyrics for words: {CUSS_WORDS}")
 
     # Analyze lyrics
-    results = analyze_lyrics()
+    results = analyze_lyrics(jobs=jobs)
 
     # Sort results by year and album
     sorted_results = dict(sorted(results.items(), key=lambda x: (x[1]["year"], x[1]["album"])))
@@ -105,7 +169,7 @@ def main(dry_run: bool = False):
         OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
         # Save results to JSON
-        OUTPUT_FILE.write_text(json.dumps(sorted_results, indent=2), encoding="utf-8")
+        OUTPUT_FILE.write_bytes(orjson.dumps(sorted_results, option=orjson.OPT_INDENT_2))
         log.info(f"\nResults saved to: {OUTPUT_FILE.relative_to(PROJECT_ROOT)}")
     else:
         log.info("\nDRY RUN: Would save results to JSON file")
@@ -128,6 +192,8 @@ if __name__ == "__main__":
     parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose output")
     parser.add_argument("-q", "--quiet", action="store_true", help="Show only errors")
     parser.add_argument("-n", "--dry-run", action="store_true", help="Run without saving output")
+    parser.add_argument("-j", "--jobs", type=int,
+                       help="Number of worker processes (default: number of CPUs)")
 
     args = parser.parse_args()
 
@@ -137,4 +203,4 @@ if __name__ == "__main__":
         datefmt="%Y-%m-%d %H:%M:%S"
     )
 
-    main(dry_run=args.dry_run)
\ No newline at end of file
+    main(dry_run=args.dry_run, jobs=args.jobs)
\ No newline at end of file
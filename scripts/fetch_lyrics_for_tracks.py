@@ -3,8 +3,8 @@
 # requires-python = ">=3.12"
 # dependencies = [
 #   "requests>=2.31.0",
-#   "beautifulsoup4>=4.12.0",
-#   "lxml>=4.9.0",
+#   "requests-cache>=1.2.0",
+#   "selectolax>=0.3.21",
 #   "tqdm"
 # ]
 # ///
@@ -20,14 +20,20 @@ import argparse
 import json
 import logging
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 from pathlib import Path
 from textwrap import dedent
 from urllib.parse import quote_plus
 from tqdm import tqdm
 
 import requests
-from bs4 import BeautifulSoup
+import requests_cache
+from requests.adapters import HTTPAdapter
+from selectolax.lexbor import LexborHTMLParser, LexborNode
+from urllib3.util.retry import Retry
 
 log = logging.getLogger(__name__)
 
@@ -40,15 +46,116 @@ PROJECT_ROOT = SCRIPT_DIR.parent
 # Input/Output paths
 METADATA_FILE = PROJECT_ROOT / "albums_metadata.json"
 CACHE_DIR = PROJECT_ROOT / "tmp" / "claude_cache" / SCRIPT_NAME
+CACHE_EXPIRY = timedelta(days=30)
 
 # Rate limiting
 REQUEST_DELAY = 1.5  # Seconds between requests to be respectful
 MAX_RETRIES = 3
 TIMEOUT = 10
+MAX_WORKERS = 4  # Tracks fetched concurrently; lookups still start REQUEST_DELAY apart
 
 # User agent to identify our script
 USER_AGENT = "Mozilla/5.0 (Educational Lyrics Research Script)"
 
+# Saved lyrics files: metadata header followed by the lyrics
+LYRICS_FILE_TEMPLATE = """# {title}
+
+Album: {album}
+Track: {number}
+Year: {year}
+
+---
+
+{lyrics}
+"""
+
+# Elements whose text content is not page text
+NON_TEXT_TAGS = frozenset({'script', 'style'})
+
+# Lyrics cleanup
+# Common language names listed under the "Translations" header
+LANGUAGES = frozenset({
+    'Türkçe', 'Español', 'Français', 'Deutsch', 'Italiano',
+    'Português', 'Polski', 'Svenska', 'Afrikaans', 'srpski',
+    'Українська', 'Беларуская', 'Slovenščina', '日本語', '中文',
+    'Русский', 'العربية', 'हिन्दी', 'Nederlands', 'Norsk'
+})
+# Lines that are always dropped: contributor counts anywhere in the line,
+# or exactly a "Translations"/"Read More" header or a language name
+DROP_LINE_RE = re.compile(
+    r'Contributor|^(?:Translations|Read More|' + '|'.join(map(re.escape, sorted(LANGUAGES))) + r')$'
+)
+# Markers of metadata lines that precede the actual lyrics
+METADATA_MARKER_RE = re.compile(r'Contributors|Translations|Lyrics')
+# Words that suggest a long opening line is background information, not lyrics
+BACKGROUND_INDICATORS = (
+    'wrote', 'was', 'were', 'dated', 'dating', 'recorded',
+    'released', 'produced', 'inspired', 'about', 'song is',
+    'track is', 'single', 'album', 'This song', 'The song'
+)
+BACKGROUND_RE = re.compile('|'.join(map(re.escape, BACKGROUND_INDICATORS)), re.IGNORECASE)
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces successive wait() calls at least `interval` seconds apart."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        """Block until the next free slot, reserving it for the caller."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        time.sleep(slot - now)
+
+
+def create_session() -> requests_cache.CachedSession:
+    """
+    Create a session with pooled keep-alive connections and retry/backoff on transient errors.
+
+    Responses are cached on disk under CACHE_DIR, including 404s from AZLyrics,
+    so re-runs do not hit the network for songs that were already looked up.
+    """
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    session = requests_cache.CachedSession(
+        str(CACHE_DIR / "http_cache"),
+        backend='sqlite',
+        expire_after=CACHE_EXPIRY,
+        allowable_codes=(200, 404),
+    )
+
+    # Retry throttling and server errors, honouring any Retry-After header
+    retries = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+    )
+    # Keep-alive pools for the two hosts (Genius, AZLyrics), one connection per worker
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=MAX_WORKERS, max_retries=retries)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    return session
+
+
+def wait_unless_cached(url: str, session: requests_cache.CachedSession, limiter: RateLimiter,
+                       force_refresh: bool = False):
+    """
+    Wait for a rate limit slot, unless a fresh response for url is already cached.
+
+    With force_refresh the cache is bypassed, so the request always goes out and always waits.
+    """
+    if not force_refresh:
+        # contains() would also match expired entries, which still go to the network
+        cached = session.cache.get_response(session.cache.create_key(requests.Request('GET', url)))
+        if cached is not None and not cached.is_expired:
+            return
+    limiter.wait()
+
 
 def load_metadata(metadata_path: Path) -> dict:
     """Load the albums metadata from JSON file."""
@@ -72,24 +179,30 @@ def clean_song_title(text: str) -> str:
     return cleaned.strip()
 
 
-def search_lyrics_genius(artist: str, title: str, session: requests.Session) -> str | None:
-    """
-    Search for lyrics on Genius.com (public website).
-
-    Returns the lyrics text or None if not found.
-    """
+def genius_search_url(artist: str, title: str) -> str:
+    """Build the Genius search API URL for a song."""
     # Clean inputs for search
     clean_artist = clean_artist_name(artist)
     clean_title = clean_song_title(title)
 
-    # Construct search URL
     search_query = f"{clean_artist} {clean_title}"
-    search_url = f"https://genius.com/api/search/multi?q={quote_plus(search_query)}"
+    return f"https://genius.com/api/search/multi?q={quote_plus(search_query)}"
+
+
+def search_lyrics_genius(artist: str, title: str, session: requests_cache.CachedSession,
+                         force_refresh: bool = False) -> str | None:
+    """
+    Search for lyrics on Genius.com (public website).
+
+    Returns the lyrics text or None if not found.
+    With force_refresh, cached responses are ignored and replaced with fresh ones.
+    """
+    search_url = genius_search_url(artist, title)
 
     try:
         # Search for the song
         headers = {'User-Agent': USER_AGENT}
-        response = session.get(search_url, headers=headers, timeout=TIMEOUT)
+        response = session.get(search_url, headers=headers, timeout=TIMEOUT, force_refresh=force_refresh)
         response.raise_for_status()
 
         data = response.json()
@@ -103,7 +216,7 @@ def search_lyrics_genius(artist: str, title: str, session: requests.Session) ->
                     # Get the URL of the first matching song
                     song_url = hits[0].get('result', {}).get('url')
                     if song_url:
-                        return fetch_lyrics_from_genius_url(song_url, session)
+                        return fetch_lyrics_from_genius_url(song_url, session, force_refresh=force_refresh)
 
         log.warning(f"No results found for: {artist} - {title}")
         return None
@@ -127,14 +240,6 @@ def clean_lyrics_text(lyrics: str, title: str) -> str:
     cleaned_lines = []
     skip_metadata = True
 
-    # Common language names to filter
-    languages = {
-        'Türkçe', 'Español', 'Français', 'Deutsch', 'Italiano',
-        'Português', 'Polski', 'Svenska', 'Afrikaans', 'srpski',
-        'Українська', 'Беларуская', 'Slovenščina', '日本語', '中文',
-        'Русский', 'العربية', 'हिन्दी', 'Nederlands', 'Norsk'
-    }
-
     for line in lines:
         line_stripped = line.strip()
 
@@ -142,42 +247,24 @@ def clean_lyrics_text(lyrics: str, title: str) -> str:
         if skip_metadata and not line_stripped:
             continue
 
-        # Skip contributor lines
-        if 'Contributors' in line_stripped or 'Contributor' in line_stripped:
-            continue
-
-        # Skip "Translations" header
-        if line_stripped == 'Translations':
-            continue
-
-        # Skip language names
-        if line_stripped in languages:
+        # Skip contributor lines, "Translations" header, language names and "Read More" lines
+        if DROP_LINE_RE.search(line_stripped):
             continue
 
         # Skip the "Song Title Lyrics" line
         if line_stripped.endswith(' Lyrics') and title in line_stripped:
             continue
 
-        # Skip "Read More" lines
-        if line_stripped == 'Read More':
-            continue
-
         # Detect start of actual lyrics - usually starts with [Verse, [Chorus, [Intro, etc
         # or starts with quotes or regular text that's not metadata
         if skip_metadata and (
             line_stripped.startswith('[') or
             line_stripped.startswith('"') or
-            (line_stripped and not any(x in line_stripped for x in ['Contributors', 'Translations', 'Lyrics']))
+            (line_stripped and not METADATA_MARKER_RE.search(line_stripped))
         ):
             # Check if this might be background info (usually longer sentences)
             # Background info typically contains "wrote", "was", "dating", etc.
-            background_indicators = [
-                'wrote', 'was', 'were', 'dated', 'dating', 'recorded',
-                'released', 'produced', 'inspired', 'about', 'song is',
-                'track is', 'single', 'album', 'This song', 'The song'
-            ]
-
-            if len(line_stripped) > 100 and any(indicator in line_stripped.lower() for indicator in background_indicators):
+            if len(line_stripped) > 100 and BACKGROUND_RE.search(line_stripped):
                 continue
 
             skip_metadata = False
@@ -189,17 +276,31 @@ def clean_lyrics_text(lyrics: str, title: str) -> str:
     return '\n'.join(cleaned_lines).strip()
 
 
-def fetch_lyrics_from_genius_url(url: str, session: requests.Session) -> str | None:
-    """Fetch lyrics from a Genius song URL."""
+def node_text(node: LexborNode) -> str:
+    """Join the stripped, non-empty text nodes under node with line breaks.
+
+    Text inside <script>/<style> is skipped, as BeautifulSoup's get_text does.
+    """
+    return '\n'.join(
+        text for child in node.traverse(include_text=True)
+        if child.tag == '-text' and child.parent.tag not in NON_TEXT_TAGS
+        and (text := child.text_content.strip())
+    )
+
+
+def fetch_lyrics_from_genius_url(url: str, session: requests_cache.CachedSession,
+                                 force_refresh: bool = False) -> str | None:
+    """Fetch lyrics from a Genius song URL, bypassing the cache with force_refresh."""
     try:
         headers = {'User-Agent': USER_AGENT}
-        response = session.get(url, headers=headers, timeout=TIMEOUT)
+        response = session.get(url, headers=headers, timeout=TIMEOUT, force_refresh=force_refresh)
         response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, 'lxml')
+        # Hand the raw body to the parser, skipping requests' text decoding
+        tree = LexborHTMLParser(response.content)
 
         # Genius stores lyrics in divs with data-lyrics-container="true"
-        lyrics_divs = soup.find_all('div', {'data-lyrics-container': 'true'})
+        lyrics_divs = tree.css('div[data-lyrics-container="true"]')
 
         if not lyrics_divs:
             log.warning(f"No lyrics container found at {url}")
@@ -209,7 +310,7 @@ def fetch_lyrics_from_genius_url(url: str, session: requests.Session) -> str | N
         lyrics_parts = []
         for div in lyrics_divs:
             # Get text and preserve line breaks
-            text = div.get_text(separator='\n', strip=True)
+            text = node_text(div)
             if text:
                 lyrics_parts.append(text)
 
@@ -220,22 +321,29 @@ def fetch_lyrics_from_genius_url(url: str, session: requests.Session) -> str | N
         return None
 
 
-def search_lyrics_azlyrics(artist: str, title: str, session: requests.Session) -> str | None:
-    """
-    Search for lyrics on AZLyrics (public website).
-
-    Returns the lyrics text or None if not found.
-    """
+def azlyrics_url(artist: str, title: str) -> str:
+    """Build the AZLyrics page URL for a song."""
     # AZLyrics URL format: azlyrics.com/lyrics/artist/songtitle.html
     # Remove all non-alphanumeric characters and lowercase
     clean_artist = re.sub(r'[^a-z0-9]', '', artist.lower())
     clean_title = re.sub(r'[^a-z0-9]', '', title.lower())
 
-    url = f"https://www.azlyrics.com/lyrics/{clean_artist}/{clean_title}.html"
+    return f"https://www.azlyrics.com/lyrics/{clean_artist}/{clean_title}.html"
+
+
+def search_lyrics_azlyrics(artist: str, title: str, session: requests_cache.CachedSession,
+                           force_refresh: bool = False) -> str | None:
+    """
+    Search for lyrics on AZLyrics (public website).
+
+    Returns the lyrics text or None if not found.
+    With force_refresh, cached responses (including 404s) are ignored and replaced with fresh ones.
+    """
+    url = azlyrics_url(artist, title)
 
     try:
         headers = {'User-Agent': USER_AGENT}
-        response = session.get(url, headers=headers, timeout=TIMEOUT)
+        response = session.get(url, headers=headers, timeout=TIMEOUT, force_refresh=force_refresh)
 
         if response.status_code == 404:
             log.debug(f"AZLyrics page not found for: {artist} - {title}")
@@ -243,21 +351,17 @@ def search_lyrics_azlyrics(artist: str, title: str, session: requests.Session) -
 
         response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        tree = LexborHTMLParser(response.content)
 
-        # Find the lyrics div (comes after a specific comment)
-        lyrics_div = None
-        for comment in soup.find_all(string=lambda text: isinstance(text, str) and "Usage of azlyrics.com content" in text):
-            lyrics_div = comment.find_next('div')
-            if lyrics_div:
-                break
+        # The lyrics div is the first unclassed div after the ringtone banner
+        lyrics_div = tree.css_first('div.ringtone ~ div:not([class])')
 
         if not lyrics_div:
             log.warning(f"No lyrics div found on AZLyrics for: {artist} - {title}")
             return None
 
         # Extract and clean lyrics
-        lyrics = lyrics_div.get_text(separator='\n', strip=True)
+        lyrics = node_text(lyrics_div)
         return lyrics if lyrics else None
 
     except Exception as e:
@@ -267,26 +371,16 @@ def search_lyrics_azlyrics(artist: str, title: str, session: requests.Session) -
 
 def save_lyrics(file_path: Path, lyrics: str, track_info: dict):
     """Save lyrics to the appropriate file with metadata header."""
-    content = f"""# {track_info['title']}
-
-Album: {track_info['album']}
-Track: {track_info['number']}
-Year: {track_info['year']}
-
----
-
-{lyrics}
-"""
+    content = LYRICS_FILE_TEMPLATE.format(lyrics=lyrics, **track_info).encode('utf-8')
 
     file_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(content)
+    file_path.write_bytes(content)
 
     log.debug(f"Saved lyrics to: {file_path.relative_to(PROJECT_ROOT)}")
 
 
-def fetch_lyrics_for_track(track: dict, album: dict, session: requests.Session,
-                           force: bool = False) -> bool:
+def fetch_lyrics_for_track(track: dict, album: dict, session: requests_cache.CachedSession,
+                           limiter: RateLimiter, force: bool = False) -> bool:
     """
     Fetch lyrics for a single track.
 
@@ -308,12 +402,15 @@ def fetch_lyrics_for_track(track: dict, album: dict, session: requests.Session,
     lyrics = None
 
     # Try Genius first (usually most complete)
-    lyrics = search_lyrics_genius(artist, title, session)
+    # --force re-fetches fresh pages rather than re-reading cached responses
+    wait_unless_cached(genius_search_url(artist, title), session, limiter, force_refresh=force)
+    lyrics = search_lyrics_genius(artist, title, session, force_refresh=force)
 
     # If not found, try AZLyrics as fallback
     if not lyrics:
-        time.sleep(REQUEST_DELAY)  # Rate limit between different sources
-        lyrics = search_lyrics_azlyrics(artist, title, session)
+        # Rate limit between different sources
+        wait_unless_cached(azlyrics_url(artist, title), session, limiter, force_refresh=force)
+        lyrics = search_lyrics_azlyrics(artist, title, session, force_refresh=force)
 
     # Clean the fetched lyrics to remove metadata cruft
     if lyrics:
@@ -347,67 +444,96 @@ def main(dry_run: bool = False, force: bool = False, limit: int | None = None,
     metadata = load_metadata(METADATA_FILE)
     log.info(f"Loaded metadata for {metadata['total_albums']} albums, {metadata['total_tracks']} tracks")
 
-    # Create session for connection pooling
-    session = requests.Session()
+    # Create session for connection pooling. Dry runs never fetch, so they skip
+    # the session (and its on-disk cache) and the worker threads entirely.
+    session = None if dry_run else create_session()
 
-    # Statistics
-    processed = 0
-    successful = 0
-    skipped = 0
-    failed = 0
+    # Tracks are fetched concurrently so network round trips overlap,
+    # while the limiter keeps lookups REQUEST_DELAY apart
+    limiter = RateLimiter(REQUEST_DELAY)
+    executor = None if dry_run else ThreadPoolExecutor(max_workers=MAX_WORKERS)
 
-    # Process albums and tracks
-    for album in metadata['albums']:
-        # Apply filters if specified
-        if album_filter and album_filter.lower() not in album['title'].lower():
-            continue
-        if year_filter and album['year'] != year_filter:
-            continue
+    try:
+        # Statistics
+        processed = 0
+        successful = 0
+        skipped = 0
+        failed = 0
+
+        # Select albums and tracks to process
+        batches = []
+        selected = 0
+        for album in metadata['albums']:
+            # Apply filters if specified
+            if album_filter and album_filter.lower() not in album['title'].lower():
+                continue
+            if year_filter and album['year'] != year_filter:
+                continue
 
-        title_string = f"ALBUM: {album['title']} ({album['year']})"
-        log.info("=" * len(title_string))
-        log.info(title_string)
-        log.info("=" * len(title_string))
+            tracks = album['tracks']
+            if limit:
+                tracks = tracks[:limit - selected]
+            batches.append((album, tracks))
+            selected += len(tracks)
 
-        for track in tqdm(album['tracks'], desc="Processing tracks", unit="track"):
-            if limit and processed >= limit:
-                log.info(f"Reached limit of {limit} tracks")
+            if limit and selected >= limit:
                 break
 
+        # Queue every track up front, so workers start on the next album's lookups
+        # while results for the current album are still being collected
+        if dry_run:
+            batch_futures = [[] for _ in batches]
+        else:
+            batch_futures = [
+                [executor.submit(fetch_lyrics_for_track, track, album, session, limiter, force=force)
+                 for track in tracks]
+                for album, tracks in batches
+            ]
+
+        # Process albums and tracks
+        for (album, tracks), futures in zip(batches, batch_futures):
+            title_string = f"ALBUM: {album['title']} ({album['year']})"
+            log.info("=" * len(title_string))
+            log.info(title_string)
+            log.info("=" * len(title_string))
+
             if dry_run:
-                log.info(f"DRY RUN: Would fetch lyrics for: {track['title']}")
-                processed += 1
+                for track in tracks:
+                    log.info(f"DRY RUN: Would fetch lyrics for: {track['title']}")
+                    processed += 1
                 continue
 
-            # Rate limiting
-            if processed > 0:
-                time.sleep(REQUEST_DELAY)
+            for track, future in tqdm(zip(tracks, futures), total=len(tracks),
+                                      desc="Processing tracks", unit="track"):
+                success = future.result()
 
-            # Fetch lyrics
-            success = fetch_lyrics_for_track(track, album, session, force=force)
-
-            processed += 1
-            if success:
-                successful += 1
-            else:
-                file_path = PROJECT_ROOT / track['file_path']
-                if file_path.exists() and file_path.stat().st_size > 0 and not force:
-                    skipped += 1
+                processed += 1
+                if success:
+                    successful += 1
                 else:
-                    failed += 1
+                    file_path = PROJECT_ROOT / track['file_path']
+                    if file_path.exists() and file_path.stat().st_size > 0 and not force:
+                        skipped += 1
+                    else:
+                        failed += 1
 
         if limit and processed >= limit:
-            break
-
-    # Summary
-    log.info("\n" + "="*50)
-    log.info("Summary:")
-    log.info(f"  Total processed: {processed}")
-    log.info(f"  Successfully fetched: {successful}")
-    log.info(f"  Skipped (already exist): {skipped}")
-    log.info(f"  Failed to fetch: {failed}")
-
-    session.close()
+            log.info(f"Reached limit of {limit} tracks")
+
+        # Summary
+        log.info("\n" + "="*50)
+        log.info("Summary:")
+        log.info(f"  Total processed: {processed}")
+        log.info(f"  Successfully fetched: {successful}")
+        log.info(f"  Skipped (already exist): {skipped}")
+        log.info(f"  Failed to fetch: {failed}")
+    finally:
+        # Every track is queued up front, so drop the queued lookups if we stop
+        # early (an error or Ctrl-C), then close the session once workers are done
+        if executor:
+            executor.shutdown(cancel_futures=True)
+        if session:
+            session.close()
 
 
 if __name__ == "__main__":
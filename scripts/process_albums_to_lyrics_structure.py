@@ -2,6 +2,7 @@
 # /// script
 # requires-python = ">=3.12"
 # dependencies = [
+#   "orjson>=3.9.0",
 # ]
 # ///
 
@@ -14,12 +15,14 @@ This script parses the studio-albums.md file and:
 """
 
 import argparse
-import json
 import logging
+import os
 import re
 from pathlib import Path
 from textwrap import dedent
 
+import orjson
+
 log = logging.getLogger(__name__)
 
 # Configuration
@@ -33,6 +36,14 @@ INPUT_FILE = PROJECT_ROOT / "studio-albums.md"
 OUTPUT_DIR = PROJECT_ROOT / "lyrics"
 OUTPUT_JSON = PROJECT_ROOT / "albums_metadata.json"
 
+# Path sanitizing: spaces become underscores; invalid path characters and other
+# problematic punctuation become hyphens. Parentheses are kept.
+PATH_TRANSLATION = str.maketrans({' ': '_'} | {c: '-' for c in '<>:"/\\|?*\',.!&'})
+MULTIPLE_HYPHENS_RE = re.compile(r'-+')
+
+# Album header lines, e.g. '## album: "Fearless" (2008)'
+ALBUM_HEADER_RE = re.compile(r'^[^\S\n]*## album: "([^"\n]+)" \((\d{4})\).*$', re.MULTILINE)
+
 
 def sanitize_for_path(text: str) -> str:
     """
@@ -40,24 +51,11 @@ def sanitize_for_path(text: str) -> str:
     - Replace spaces with underscores
     - Replace other invalid characters with hyphens
     """
-    # First, replace spaces with underscores
-    text = text.replace(" ", "_")
-
-    # Replace common invalid path characters with hyphens
-    # Keep parentheses, letters, numbers, underscores, and hyphens
-    invalid_chars = r'[<>:"/\\|?*]'
-    text = re.sub(invalid_chars, "-", text)
-
-    # Replace other problematic characters
-    text = text.replace("'", "-")
-    text = text.replace(",", "-")
-    text = text.replace(".", "-")
-    text = text.replace("!", "-")
-    text = text.replace("&", "-")
-    text = text.replace("...", "-")
+    # Replace spaces and all invalid characters in a single pass
+    text = text.translate(PATH_TRANSLATION)
 
     # Clean up multiple hyphens
-    text = re.sub(r'-+', '-', text)
+    text = MULTIPLE_HYPHENS_RE.sub('-', text)
 
     # Remove trailing/leading hyphens or underscores
     text = text.strip('-_')
@@ -72,41 +70,29 @@ def parse_albums_file(file_path: Path) -> list[dict]:
     Returns a list of album dictionaries with tracks.
     """
     albums = []
-    current_album = None
-    track_number = 0
-
-    with open(file_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-
-    for line in lines:
-        line = line.strip()
-
-        # Check for album header
-        if line.startswith('## album:'):
-            # Extract album title and year using regex
-            match = re.match(r'## album: "([^"]+)" \((\d{4})\)', line)
-            if match:
-                album_title = match.group(1)
-                year = match.group(2)
-
-                # Save previous album if exists
-                if current_album:
-                    albums.append(current_album)
-
-                # Start new album
-                current_album = {
-                    'title': album_title,
-                    'year': year,
-                    'sanitized_title': sanitize_for_path(album_title),
-                    'tracks': []
-                }
-                track_number = 0
-                log.debug(f"Found album: {album_title} ({year})")
-
-        # Check for track (non-empty line that's not a header and not bonus track indicator)
-        elif line and not line.startswith('#') and current_album:
-            # Skip lines that are just bonus track indicators
-            if line.startswith('(') and line.endswith(')'):
+
+    text = file_path.read_text(encoding='utf-8')
+
+    # Each album block runs from its header to the next album header (or end of file)
+    headers = list(ALBUM_HEADER_RE.finditer(text))
+    for header, next_header in zip(headers, headers[1:] + [None]):
+        album_title, year = header.groups()
+        block = text[header.end():next_header.start() if next_header else len(text)]
+
+        current_album = {
+            'title': album_title,
+            'year': year,
+            'sanitized_title': sanitize_for_path(album_title),
+            'tracks': []
+        }
+        log.debug(f"Found album: {album_title} ({year})")
+
+        track_number = 0
+        for line in block.split('\n'):
+            line = line.strip()
+
+            # Skip blank lines, other headers and bonus track indicators like "(Deluxe Edition)"
+            if not line or line.startswith('#') or (line.startswith('(') and line.endswith(')')):
                 continue
 
             # This is a track
@@ -119,8 +105,6 @@ def parse_albums_file(file_path: Path) -> list[dict]:
             current_album['tracks'].append(track)
             log.debug(f"  Track {track_number}: {line}")
 
-    # Don't forget the last album
-    if current_album:
         albums.append(current_album)
 
     return albums
@@ -152,8 +136,13 @@ def create_folder_structure(albums: list[dict], output_dir: Path, dry_run: bool
             track_file = album_dir / f"{track_num}_{track_title}.md"
 
             if not dry_run:
-                track_file.touch(exist_ok=True)
-                log.debug(f"  Created file: {track_file.name}")
+                # Exclusive create: one syscall for files that already exist and,
+                # unlike touch(), existing files are left untouched
+                try:
+                    os.close(os.open(track_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+                    log.debug(f"  Created file: {track_file.name}")
+                except FileExistsError:
+                    log.debug(f"  File exists: {track_file.name}")
             else:
                 log.debug(f"  DRY RUN: Would create file: {track_file.name}")
 
@@ -195,8 +184,7 @@ def save_metadata(albums: list[dict], output_path: Path, dry_run: bool = False):
         metadata['albums'].append(album_data)
 
     if not dry_run:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        output_path.write_bytes(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
         log.info(f"Saved metadata to: {output_path.relative_to(PROJECT_ROOT)}")
     else:
         log.info(f"DRY RUN: Would save metadata to: {output_path.relative_to(PROJECT_ROOT)}")